@@ -4,16 +4,26 @@ FastAPI backend for the arXiv Scraper application.
 Provides API endpoints to view, filter, and manage scraped papers.
 """
 
+import asyncio
+import math
 import os
-import sys
-import subprocess
+import numpy as np
+import threading
+import duckdb
+import orjson
 import pandas as pd
+import pyarrow.csv as pacsv
+import pyarrow.parquet as pq
+from functools import lru_cache
+from io import BytesIO
 from pathlib import Path
 from datetime import datetime
+from email.utils import formatdate, parsedate_to_datetime
 from typing import Optional, List
-from fastapi import FastAPI, HTTPException, Query, BackgroundTasks
+from fastapi import FastAPI, HTTPException, Query, BackgroundTasks, Request
+from fastapi.middleware.gzip import GZipMiddleware
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import HTMLResponse, FileResponse
+from fastapi.responses import HTMLResponse, FileResponse, ORJSONResponse, Response, StreamingResponse
 from pydantic import BaseModel
 import logging
 
@@ -28,12 +38,33 @@ logger = logging.getLogger(__name__)
 RESULTS_FOLDER = "results"
 STATIC_FOLDER = "static"
 
+# Optional accelerator: with numba installed the score histogram is a single
+# JIT-compiled pass over the float array; otherwise np.histogram is used.
+# Worthwhile once the corpus grows to millions of evaluated rows.
+try:
+    from numba import njit
+
+    @njit(cache=True)
+    def _score_hist(scores):
+        out = np.zeros(10, np.int64)
+        for i in range(scores.size):
+            k = int(scores[i]) - 1
+            if 0 <= k < 10:
+                out[k] += 1
+        return out
+except ImportError:
+    _score_hist = None
+
 app = FastAPI(
     title="arXiv Paper Scraper",
     description="A web interface for scraping and evaluating arXiv papers for startup viability",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=ORJSONResponse
 )
 
+# Compress JSON payloads above 1 KiB (paper pages with abstracts squash well)
+app.add_middleware(GZipMiddleware, minimum_size=1024)
+
 # Mount static files
 app.mount("/static", StaticFiles(directory=STATIC_FOLDER), name="static")
 
@@ -78,35 +109,174 @@ class TaskStatus(BaseModel):
 task_status = {"scraper": None, "evaluator": None}
 
 
-def get_csv_files():
-    """Get all CSV files in the results directory."""
+# In-memory cache keyed on (path, mtime) so a rewrite of the Parquet file
+# automatically invalidates the cached copy. The Arrow table is the primary
+# cached object; a pandas view is derived lazily for endpoints that need it.
+_TABLE_CACHE: dict = {}
+_DF_CACHE: dict = {}
+_CACHE_LOCK = threading.Lock()
+
+# In-memory DuckDB used as the query engine over the cached Arrow table;
+# cursors created from it are cheap and safe to use across threads
+_DUCK = duckdb.connect()
+
+
+@lru_cache(maxsize=1)
+def _list_result_files(dir_mtime: float):
+    """List Parquet files in the results directory, cached on the directory mtime."""
+    results_path = Path(RESULTS_FOLDER)
+    return sorted(results_path.glob("*.parquet"), key=lambda x: x.stat().st_mtime, reverse=True)
+
+
+def get_result_files():
+    """Get all Parquet files in the results directory."""
     results_path = Path(RESULTS_FOLDER)
     if not results_path.exists():
         return []
-    return sorted(results_path.glob("*.csv"), key=lambda x: x.stat().st_mtime, reverse=True)
+    return _list_result_files(results_path.stat().st_mtime)
+
+
+def _read_table_cached(path):
+    """Read a Parquet file, reusing the cached Arrow table until the file changes."""
+    path = str(path)
+    mtime = os.stat(path).st_mtime
+    key = (path, mtime)
+    with _CACHE_LOCK:
+        table = _TABLE_CACHE.get(key)
+        if table is None:
+            table = pq.read_table(path)
+            # Evict stale entries for this path before caching the fresh read
+            for stale in [k for k in _TABLE_CACHE if k[0] == path]:
+                del _TABLE_CACHE[stale]
+                _DF_CACHE.pop(stale, None)
+            _TABLE_CACHE[key] = table
+    return key, table
+
+
+def _current_papers_file():
+    """Pick the Parquet file to serve, preferring the evaluated one."""
+    result_files = get_result_files()
+
+    if not result_files:
+        return None
+
+    evaluated_file = Path(RESULTS_FOLDER) / "arxiv_papers_evaluated.parquet"
+    base_file = Path(RESULTS_FOLDER) / "arxiv_papers.parquet"
+
+    if evaluated_file.exists():
+        return evaluated_file
+    elif base_file.exists():
+        return base_file
+    return result_files[0]
 
 
-def load_papers_df(evaluated_only: bool = False):
-    """Load papers from CSV files."""
-    csv_files = get_csv_files()
+def load_papers_table():
+    """Load papers as a pyarrow Table, or None if no results exist."""
+    source = _current_papers_file()
+    if source is None:
+        return None
+    _, table = _read_table_cached(source)
+    return table
 
-    if not csv_files:
+
+def load_papers_df(evaluated_only: bool = False):
+    """Load papers as a pandas DataFrame (derived lazily from the cached table)."""
+    source = _current_papers_file()
+    if source is None:
         return pd.DataFrame()
 
-    # Prefer evaluated file if it exists
-    evaluated_file = Path(RESULTS_FOLDER) / "arxiv_papers_evaluated.csv"
-    base_file = Path(RESULTS_FOLDER) / "arxiv_papers.csv"
+    key, table = _read_table_cached(source)
+    with _CACHE_LOCK:
+        df = _DF_CACHE.get(key)
+        if df is None:
+            # ArrowDtype keeps strings in Arrow buffers, so .str operations
+            # run in C instead of looping over per-row Python objects
+            df = table.to_pandas(types_mapper=pd.ArrowDtype)
+            _DF_CACHE[key] = df
+    return df
+
+
+def _nn(value):
+    """Normalize missing values (None or NaN) to None without pandas dispatch."""
+    if value is None or (isinstance(value, float) and math.isnan(value)):
+        return None
+    return value
+
+
+def _row_to_paper(rec: dict) -> Paper:
+    """Build a Paper from an already-extracted record.
+
+    The record comes from the typed Arrow table (or a NaN-normalized pandas
+    row), so model_construct skips validation and _nn covers the only
+    missing-value shapes that can appear.
+    """
+    score = _nn(rec.get('score'))
+    return Paper.model_construct(
+        id=str(rec.get('id') or ''),
+        title=str(rec.get('title') or ''),
+        categories=str(rec.get('categories') or ''),
+        abstract=str(rec.get('abstract') or ''),
+        doi=_nn(rec.get('doi')),
+        created=_nn(rec.get('created')),
+        updated=_nn(rec.get('updated')),
+        authors=str(rec.get('authors') or ''),
+        score=float(score) if score is not None else None,
+        reasoning=_nn(rec.get('reasoning'))
+    )
 
-    if evaluated_only and evaluated_file.exists():
-        return pd.read_csv(evaluated_file)
-    elif evaluated_file.exists():
-        return pd.read_csv(evaluated_file)
-    elif base_file.exists():
-        return pd.read_csv(base_file)
-    elif csv_files:
-        return pd.read_csv(csv_files[0])
 
-    return pd.DataFrame()
+def _query_papers(table, search, category, min_score, max_score,
+                  sort_by, sort_order, offset, limit):
+    """Filter, sort, and paginate papers with DuckDB over the Arrow table.
+
+    DuckDB scans the registered table in place (zero-copy) and pushes the
+    predicates into the scan, so no intermediate copies are materialized.
+    Returns (total_matching, page_records).
+    """
+    con = _DUCK.cursor()
+    con.register("papers", table)
+
+    clauses = []
+    params = []
+
+    if search:
+        # ILIKE matches case-insensitively in one pass instead of building a
+        # lowered copy of each column via lower(...). Escape LIKE wildcards so
+        # the search text is matched as a literal substring.
+        escaped = search.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+        pattern = f"%{escaped}%"
+        clauses.append(
+            "(title ILIKE ? ESCAPE '\\' OR abstract ILIKE ? ESCAPE '\\' OR authors ILIKE ? ESCAPE '\\')"
+        )
+        params.extend([pattern, pattern, pattern])
+
+    if category:
+        clauses.append("contains(categories, ?)")
+        params.append(category)
+
+    if min_score is not None and 'score' in table.column_names:
+        clauses.append("score >= ?")
+        params.append(min_score)
+
+    if max_score is not None and 'score' in table.column_names:
+        clauses.append("score <= ?")
+        params.append(max_score)
+
+    where = f" WHERE {' AND '.join(clauses)}" if clauses else ""
+
+    # sort_by/sort_order are validated by the Query regex, safe to interpolate
+    order = ""
+    if sort_by in table.column_names:
+        direction = "ASC" if sort_order == "asc" else "DESC"
+        order = f' ORDER BY "{sort_by}" {direction} NULLS LAST'
+
+    total = con.execute(f"SELECT count(*) FROM papers{where}", params).fetchone()[0]
+    records = con.execute(
+        f"SELECT * FROM papers{where}{order} LIMIT ? OFFSET ?",
+        params + [limit, offset]
+    ).fetch_arrow_table().to_pylist()
+
+    return total, records
 
 
 @app.get("/", response_class=HTMLResponse)
@@ -115,8 +285,12 @@ async def root():
     return FileResponse(os.path.join(STATIC_FOLDER, "index.html"))
 
 
-@app.get("/api/papers", response_model=PapersResponse)
+# No response_model on the hot paths: the payload is built from already-typed
+# data, so re-validating it on the way out would just burn CPU per request.
+@app.get("/api/papers")
 async def get_papers(
+    request: Request,
+    response: Response,
     page: int = Query(1, ge=1),
     per_page: int = Query(20, ge=1, le=100),
     search: Optional[str] = None,
@@ -127,58 +301,34 @@ async def get_papers(
     sort_order: str = Query("desc", regex="^(asc|desc)$")
 ):
     """Get paginated list of papers with optional filtering."""
-    df = load_papers_df()
-
-    if df.empty:
+    # Conditional-request support: the listing only changes when the backing
+    # Parquet file does, so its mtime works as a Last-Modified validator
+    source = _current_papers_file()
+    if source is not None:
+        mtime = os.path.getmtime(source)
+        response.headers["Last-Modified"] = formatdate(mtime, usegmt=True)
+        if_modified_since = request.headers.get("if-modified-since")
+        if if_modified_since:
+            try:
+                if int(mtime) <= parsedate_to_datetime(if_modified_since).timestamp():
+                    return Response(status_code=304, headers=dict(response.headers))
+            except (TypeError, ValueError):
+                pass
+
+    # Cold cache misses do real disk I/O; keep them off the event loop
+    table = await asyncio.to_thread(load_papers_table)
+
+    if table is None or table.num_rows == 0:
         return PapersResponse(papers=[], total=0, page=page, per_page=per_page, total_pages=0)
 
-    # Apply filters
-    if search:
-        search_lower = search.lower()
-        mask = (
-            df['title'].str.lower().str.contains(search_lower, na=False) |
-            df['abstract'].str.lower().str.contains(search_lower, na=False) |
-            df['authors'].str.lower().str.contains(search_lower, na=False)
-        )
-        df = df[mask]
-
-    if category:
-        df = df[df['categories'].str.contains(category, na=False)]
-
-    if min_score is not None and 'score' in df.columns:
-        df = df[df['score'] >= min_score]
-
-    if max_score is not None and 'score' in df.columns:
-        df = df[df['score'] <= max_score]
-
-    # Sort
-    if sort_by in df.columns:
-        ascending = sort_order == "asc"
-        df = df.sort_values(by=sort_by, ascending=ascending, na_position='last')
-
-    # Pagination
-    total = len(df)
-    total_pages = (total + per_page - 1) // per_page
     start = (page - 1) * per_page
-    end = start + per_page
-    df_page = df.iloc[start:end]
-
-    # Convert to list of Paper objects
-    papers = []
-    for _, row in df_page.iterrows():
-        paper = Paper(
-            id=str(row.get('id', '')),
-            title=str(row.get('title', '')),
-            categories=str(row.get('categories', '')),
-            abstract=str(row.get('abstract', '')),
-            doi=str(row.get('doi', '')) if pd.notna(row.get('doi')) else None,
-            created=str(row.get('created', '')) if pd.notna(row.get('created')) else None,
-            updated=str(row.get('updated', '')) if pd.notna(row.get('updated')) else None,
-            authors=str(row.get('authors', '')),
-            score=float(row.get('score', 0)) if pd.notna(row.get('score', None)) and 'score' in row else None,
-            reasoning=str(row.get('reasoning', '')) if pd.notna(row.get('reasoning', None)) and 'reasoning' in row else None
-        )
-        papers.append(paper)
+    total, records = await asyncio.to_thread(
+        _query_papers, table, search, category, min_score, max_score,
+        sort_by, sort_order, start, per_page
+    )
+    total_pages = (total + per_page - 1) // per_page
+
+    papers = [_row_to_paper(rec) for rec in records]
 
     return PapersResponse(
         papers=papers,
@@ -189,10 +339,44 @@ async def get_papers(
     )
 
 
+@app.get("/api/papers/stream")
+async def stream_papers(
+    page: int = Query(1, ge=1),
+    per_page: int = Query(20, ge=1, le=100),
+    search: Optional[str] = None,
+    category: Optional[str] = None,
+    min_score: Optional[float] = Query(None, ge=0, le=10),
+    max_score: Optional[float] = Query(None, ge=0, le=10),
+    sort_by: str = Query("created", regex="^(created|updated|score|title)$"),
+    sort_order: str = Query("desc", regex="^(asc|desc)$")
+):
+    """Stream the filtered papers page as newline-delimited JSON.
+
+    Each row is serialized and sent individually, so large pages render
+    progressively on the client instead of waiting for one buffered blob.
+    """
+    table = await asyncio.to_thread(load_papers_table)
+
+    if table is None or table.num_rows == 0:
+        return StreamingResponse(iter(()), media_type="application/x-ndjson")
+
+    start = (page - 1) * per_page
+    _, records = await asyncio.to_thread(
+        _query_papers, table, search, category, min_score, max_score,
+        sort_by, sort_order, start, per_page
+    )
+
+    def gen():
+        for rec in records:
+            yield orjson.dumps(rec) + b"\n"
+
+    return StreamingResponse(gen(), media_type="application/x-ndjson")
+
+
 @app.get("/api/paper/{paper_id}")
 async def get_paper(paper_id: str):
     """Get a single paper by ID."""
-    df = load_papers_df()
+    df = await asyncio.to_thread(load_papers_df)
 
     if df.empty:
         raise HTTPException(status_code=404, detail="No papers found")
@@ -202,25 +386,15 @@ async def get_paper(paper_id: str):
     if paper_row.empty:
         raise HTTPException(status_code=404, detail="Paper not found")
 
-    row = paper_row.iloc[0]
-    return Paper(
-        id=str(row.get('id', '')),
-        title=str(row.get('title', '')),
-        categories=str(row.get('categories', '')),
-        abstract=str(row.get('abstract', '')),
-        doi=str(row.get('doi', '')) if pd.notna(row.get('doi')) else None,
-        created=str(row.get('created', '')) if pd.notna(row.get('created')) else None,
-        updated=str(row.get('updated', '')) if pd.notna(row.get('updated')) else None,
-        authors=str(row.get('authors', '')),
-        score=float(row.get('score', 0)) if pd.notna(row.get('score', None)) and 'score' in row else None,
-        reasoning=str(row.get('reasoning', '')) if pd.notna(row.get('reasoning', None)) and 'reasoning' in row else None
-    )
+    # One vectorized extraction to a plain dict instead of per-field Series access
+    rec = paper_row.astype(object).where(paper_row.notna(), None).to_dict("records")[0]
+    return _row_to_paper(rec)
 
 
-@app.get("/api/stats", response_model=StatsResponse)
+@app.get("/api/stats")
 async def get_stats():
     """Get statistics about the scraped papers."""
-    df = load_papers_df()
+    df = await asyncio.to_thread(load_papers_df)
 
     if df.empty:
         return StatsResponse(
@@ -241,17 +415,20 @@ async def get_stats():
         evaluated_df = df[df['score'] > 0]
         evaluated_count = len(evaluated_df)
         if evaluated_count > 0:
-            avg_score = round(evaluated_df['score'].mean(), 2)
-            # Score distribution
-            for i in range(1, 11):
-                score_dist[str(i)] = int(((evaluated_df['score'] >= i) & (evaluated_df['score'] < i + 1)).sum())
-
-    # Category distribution
-    categories = {}
-    for cats in df['categories'].dropna():
-        for cat in str(cats).split():
-            cat_main = cat.split('.')[0]
-            categories[cat_main] = categories.get(cat_main, 0) + 1
+            avg_score = round(float(evaluated_df['score'].mean()), 2)
+            # Score distribution in one histogram pass instead of ten masked sums
+            scores = np.ascontiguousarray(evaluated_df['score'].to_numpy(), dtype=np.float64)
+            if _score_hist is not None:
+                counts = _score_hist(scores)
+            else:
+                counts, _ = np.histogram(scores, bins=np.arange(1, 12))
+            score_dist = {str(i + 1): int(c) for i, c in enumerate(counts)}
+
+    # Category distribution: strip subcategory suffixes (e.g. "cs.LG" -> "cs")
+    # while the values are still one string per row, then explode the
+    # space-separated tokens and count them without a Python loop per row
+    main_cats = df['categories'].dropna().str.replace(r'\.\S+', '', regex=True).str.split().explode()
+    categories = {k: int(v) for k, v in main_cats.value_counts().items()}
 
     # Last scrape time
     last_scrape = None
@@ -269,10 +446,27 @@ async def get_stats():
     )
 
 
+@app.get("/api/export/csv")
+async def export_csv():
+    """Export the current papers as a CSV download."""
+    source = _current_papers_file()
+
+    if source is None:
+        raise HTTPException(status_code=404, detail="No papers found")
+
+    buf = BytesIO()
+    await asyncio.to_thread(lambda: pacsv.write_csv(pq.read_table(source), buf))
+    return Response(
+        content=buf.getvalue(),
+        media_type="text/csv",
+        headers={"Content-Disposition": "attachment; filename=arxiv_papers.csv"}
+    )
+
+
 @app.get("/api/categories")
 async def get_categories():
     """Get list of unique categories."""
-    df = load_papers_df()
+    df = await asyncio.to_thread(load_papers_df)
 
     if df.empty:
         return {"categories": []}
@@ -286,39 +480,36 @@ async def get_categories():
 
 
 def run_scraper():
-    """Run the scraper script."""
+    """Run the scraper in-process.
+
+    Synchronous on purpose: BackgroundTasks executes it on the thread pool,
+    so the blocking scrape never touches the event loop and we skip the
+    interpreter startup and duplicate imports of a subprocess.
+    """
     global task_status
     task_status["scraper"] = "running"
     try:
-        result = subprocess.run(
-            [sys.executable, "main.py"],
-            capture_output=True,
-            text=True,
-            timeout=600
-        )
-        if result.returncode == 0:
-            task_status["scraper"] = "completed"
-        else:
-            task_status["scraper"] = f"failed: {result.stderr}"
+        # Imported lazily so the API can start without the scraper deps loaded
+        import main as scraper
+        scraper.main()
+        task_status["scraper"] = "completed"
     except Exception as e:
         task_status["scraper"] = f"error: {str(e)}"
 
 
-def run_evaluator(num_rows: str):
-    """Run the evaluator script."""
+async def run_evaluator(num_rows: int):
+    """Run the evaluator in-process on the event loop."""
     global task_status
     task_status["evaluator"] = "running"
     try:
-        result = subprocess.run(
-            [sys.executable, "evaluator.py", "--rows", str(num_rows)],
-            capture_output=True,
-            text=True,
-            timeout=3600
-        )
-        if result.returncode == 0:
-            task_status["evaluator"] = "completed"
-        else:
-            task_status["evaluator"] = f"failed: {result.stderr}"
+        # Imported lazily so the API can start without OPENAI_API_KEY set
+        import evaluator
+        input_path = evaluator.get_latest_parquet()
+        if not input_path:
+            task_status["evaluator"] = "failed: no results to evaluate"
+            return
+        await evaluator.evaluate_papers(input_path, num_rows=num_rows)
+        task_status["evaluator"] = "completed"
     except Exception as e:
         task_status["evaluator"] = f"error: {str(e)}"
 
@@ -342,7 +533,7 @@ async def trigger_evaluate(
     if task_status.get("evaluator") == "running":
         return TaskStatus(status="running", message="Evaluator is already running")
 
-    background_tasks.add_task(run_evaluator, str(num_rows))
+    background_tasks.add_task(run_evaluator, num_rows)
     return TaskStatus(status="started", message=f"Evaluator started for {num_rows} papers")
 
 
@@ -362,4 +553,16 @@ if __name__ == "__main__":
     Path(STATIC_FOLDER).mkdir(exist_ok=True)
     Path(RESULTS_FOLDER).mkdir(exist_ok=True)
 
-    uvicorn.run(app, host="0.0.0.0", port=8000)
+    # uvloop + httptools cut event-loop/HTTP-parse overhead. Workers default
+    # to 1 because task_status lives in process memory: with more workers the
+    # status polls land on arbitrary processes and the "already running"
+    # guards stop preventing concurrent scrapes. Raise WEB_CONCURRENCY only
+    # once task state is shared across processes.
+    uvicorn.run(
+        "app:app",
+        host="0.0.0.0",
+        port=8000,
+        loop="uvloop",
+        http="httptools",
+        workers=int(os.environ.get("WEB_CONCURRENCY", 1))
+    )
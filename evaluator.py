@@ -1,13 +1,14 @@
 #!/usr/bin/env python3
 
 import os
-import json
+import asyncio
 import pandas as pd
-import re
+import pyarrow as pa
+import pyarrow.parquet as pq
 from dotenv import load_dotenv
-from openai import OpenAI
+from openai import AsyncOpenAI
+from pydantic import BaseModel
 import logging
-import time
 from pathlib import Path
 
 # Set up logging
@@ -20,87 +21,106 @@ logger = logging.getLogger(__name__)
 # Load environment variables
 load_dotenv()
 
-# Initialize OpenAI client
-client = OpenAI(api_key=os.environ.get("OPENAI_API_KEY"))
+# Initialize OpenAI client; retries on 429/5xx are handled by the client
+# itself with exponential backoff
+client = AsyncOpenAI(api_key=os.environ.get("OPENAI_API_KEY"), max_retries=5)
+
+# Cap on in-flight API requests
+MAX_CONCURRENT_REQUESTS = 16
+
+# Abstracts evaluated per API call; batching amortizes per-request overhead
+# and the repeated system-prompt tokens
+BATCH_SIZE = 10
+
+
+class EvalResult(BaseModel):
+    """Per-abstract result the model is constrained to via structured outputs"""
+    index: int
+    score: float
+    reasoning: str
+
+
+class EvalBatch(BaseModel):
+    """Schema for one batched evaluation response"""
+    results: list[EvalResult]
 
 # System prompt for evaluating startup viability
 SYSTEM_PROMPT = """
-I am sending you a list of paper abstracts. Please give a score from 1-10 on how viable the paper topic is to be turned into a startup.
+I am sending you a numbered list of paper abstracts. For each abstract, give a score from 1-10 on how viable the paper topic is to be turned into a startup.
 
 1 = Not viable at all (purely theoretical with no practical applications)
 10 = Extremely viable (ready for commercialization with clear market potential)
 
-Respond with a JSON object containing:
-1. "score": a number between 1 and 10
-2. "reasoning": a brief explanation (max 3 sentences) of your score
-
-Example response format:
-{"score": 7, "reasoning": "The technology addresses a clear market need in cybersecurity. The approach is novel compared to existing solutions. However, implementation costs may be high for initial market entry."}
+Return one result per abstract containing:
+1. "index": the number of the abstract the result refers to
+2. "score": a number between 1 and 10
+3. "reasoning": a brief explanation (max 3 sentences) of your score
 """
 
 
-def evaluate_abstract(abstract, client):
-    """Evaluate a paper abstract using OpenAI's 4o model"""
+async def evaluate_batch(batch, client):
+    """Evaluate a batch of paper abstracts with a single OpenAI 4o call
+
+    Args:
+        batch: List of (df_index, abstract) pairs
+
+    Returns:
+        Dict mapping df_index to {"score": ..., "reasoning": ...}
+    """
     try:
-        # Call OpenAI API with the abstract
-        response = client.chat.completions.create(
+        # Number the abstracts 1..K; structured outputs constrain the model to
+        # one EvalResult per abstract, keyed back by that number
+        user_message = "\n\n".join(
+            f"{pos}. {abstract}" for pos, (_, abstract) in enumerate(batch, start=1)
+        )
+
+        response = await client.chat.completions.parse(
             model="gpt-4o",
             messages=[
                 {"role": "system", "content": SYSTEM_PROMPT},
-                {"role": "user", "content": abstract}
+                {"role": "user", "content": user_message}
             ],
-            temperature=0.5,  # Lower temperature for more consistent scoring
-            max_tokens=150    # Limit token usage for efficiency
+            response_format=EvalBatch,
+            temperature=0.5,            # Lower temperature for more consistent scoring
+            max_tokens=150 * len(batch)  # Limit token usage for efficiency
         )
-        
-        # Extract the JSON response
-        result_text = response.choices[0].message.content.strip()
-        
-        # Handle potential non-JSON responses
-        try:
-            # Parse the JSON response
-            result = json.loads(result_text)
-            # Ensure score is a number between 1 and 10
-            score = float(result.get("score", 0))
-            score = max(1, min(10, score))  # Clamp between 1 and 10
-            reasoning = result.get("reasoning", "No reasoning provided")
-            
-            return {
-                "score": score,
-                "reasoning": reasoning
-            }
-        except json.JSONDecodeError:
-            # If response is not valid JSON, attempt to extract score and reasoning
-            score_match = re.search(r'score["\']?\s*[:]?\s*(\d+(?:\.\d+)?)', result_text, re.IGNORECASE)
-            score = float(score_match.group(1)) if score_match else 0
-            score = max(1, min(10, score))  # Clamp between 1 and 10
-            
-            # Extract reasoning (anything after "reasoning" keyword)
-            reasoning_match = re.search(r'reasoning["\']?\s*[:]?\s*["\'](.*?)["\']}?', result_text, re.IGNORECASE | re.DOTALL)
-            reasoning = reasoning_match.group(1) if reasoning_match else "Unable to parse reasoning"
-            
-            return {
-                "score": score,
-                "reasoning": reasoning
-            }
-            
+
+        parsed = response.choices[0].message.parsed
+        results = {}
+        for item in parsed.results:
+            if not 1 <= item.index <= len(batch):
+                logger.warning(f"Discarding result with out-of-range index {item.index}")
+                continue
+            df_index = batch[item.index - 1][0]
+            score = max(1, min(10, float(item.score)))  # Clamp between 1 and 10
+            results[df_index] = {"score": score, "reasoning": item.reasoning}
+        return results
+
     except Exception as e:
-        logger.error(f"Error evaluating abstract: {e}")
-        return {"score": 0, "reasoning": f"Error: {str(e)}"}
+        logger.error(f"Error evaluating batch: {e}")
+        return {df_index: {"score": 0, "reasoning": f"Error: {str(e)}"} for df_index, _ in batch}
 
 
-def evaluate_papers(csv_path, output_path=None, num_rows='*'):
-    """Evaluate papers from a CSV file
-    
+async def _evaluate_batch(sem, batch_num, total_batches, batch):
+    """Evaluate one batch under the concurrency semaphore"""
+    async with sem:
+        logger.info(f"Evaluating batch {batch_num}/{total_batches} ({len(batch)} papers)")
+        return await evaluate_batch(batch, client)
+
+
+async def evaluate_papers(input_path, output_path=None, num_rows='*'):
+    """Evaluate papers from a Parquet file
+
     Args:
-        csv_path: Path to the CSV file containing arXiv papers
-        output_path: Path to save the output CSV file (defaults to original filename with _evaluated suffix)
+        input_path: Path to the Parquet file containing arXiv papers
+        output_path: Path to save the output Parquet file (defaults to original filename with _evaluated suffix)
         num_rows: Number of rows to evaluate (default '*' for all rows)
     """
     try:
-        # Load the CSV file
-        df = pd.read_csv(csv_path)
-        logger.info(f"Loaded {len(df)} papers from {csv_path}")
+        # Load the Parquet file with Arrow-backed dtypes (no per-string
+        # Python objects, and a lossless round-trip back to Parquet)
+        df = pq.read_table(input_path).to_pandas(types_mapper=pd.ArrowDtype)
+        logger.info(f"Loaded {len(df)} papers from {input_path}")
         
         # Determine how many rows to process
         if num_rows != '*':
@@ -117,55 +137,63 @@ def evaluate_papers(csv_path, output_path=None, num_rows='*'):
         if 'reasoning' not in df.columns:
             df['reasoning'] = ''
         
-        # Process each row
+        # Collect rows with usable abstracts, then group them into batches
+        items = []
         for idx, row in df.iterrows():
             abstract = row['abstract']
             if pd.isna(abstract) or not abstract.strip():
                 logger.warning(f"Skipping paper at index {idx} due to empty abstract")
                 continue
-                
-            logger.info(f"Evaluating paper {idx+1}/{len(df)}: {row['title'][:50]}...")
-            result = evaluate_abstract(abstract, client)
-            
-            # Update the DataFrame
-            df.at[idx, 'score'] = result['score']
-            df.at[idx, 'reasoning'] = result['reasoning']
-            
-            # Add a small delay to avoid rate limiting
-            time.sleep(0.5)
+            items.append((idx, abstract))
+
+        batches = [items[i:i + BATCH_SIZE] for i in range(0, len(items), BATCH_SIZE)]
+
+        # Fan the batched calls out concurrently; the semaphore bounds
+        # in-flight requests and the client retries with backoff on rate limits
+        sem = asyncio.Semaphore(MAX_CONCURRENT_REQUESTS)
+        batch_results = await asyncio.gather(
+            *(_evaluate_batch(sem, n, len(batches), batch)
+              for n, batch in enumerate(batches, start=1))
+        )
+
+        # Update the DataFrame
+        for results in batch_results:
+            for idx, result in results.items():
+                df.at[idx, 'score'] = result['score']
+                df.at[idx, 'reasoning'] = result['reasoning']
         
         # Save the results
         if output_path is None:
             # Generate default output path
-            input_path = Path(csv_path)
-            output_path = input_path.parent / f"{input_path.stem}_evaluated{input_path.suffix}"
-        
-        df.to_csv(output_path, index=False)
+            in_path = Path(input_path)
+            output_path = in_path.parent / f"{in_path.stem}_evaluated{in_path.suffix}"
+
+        pq.write_table(pa.Table.from_pandas(df, preserve_index=False), output_path, compression='zstd')
         logger.info(f"Saved evaluated papers to {output_path}")
-        
+
         return df
-        
+
     except Exception as e:
-        logger.error(f"Error processing CSV: {e}")
+        logger.error(f"Error processing papers: {e}")
         raise
 
 
-def get_latest_csv(directory="results"):
-    """Get the path to the latest CSV file in the results directory"""
+def get_latest_parquet(directory="results"):
+    """Get the path to the latest Parquet file in the results directory"""
     try:
-        # Get all CSV files in the directory
-        csv_files = list(Path(directory).glob("*.csv"))
-        
-        if not csv_files:
-            logger.error(f"No CSV files found in {directory}")
+        # Get all Parquet files in the directory
+        parquet_files = list(Path(directory).glob("*.parquet"))
+
+        if not parquet_files:
+            logger.error(f"No Parquet files found in {directory}")
             return None
-        
+
         # Find the most recent file
-        latest_file = max(csv_files, key=lambda x: x.stat().st_mtime)
+        latest_file = max(parquet_files, key=lambda x: x.stat().st_mtime)
         return str(latest_file)
-        
+
     except Exception as e:
-        logger.error(f"Error finding latest CSV: {e}")
+        logger.error(f"Error finding latest Parquet file: {e}")
         return None
 
 
@@ -174,23 +202,23 @@ def main():
     import argparse
     
     parser = argparse.ArgumentParser(description='Evaluate arXiv papers for startup viability')
-    parser.add_argument('--csv', help='Path to the CSV file containing arXiv papers')
+    parser.add_argument('--input', help='Path to the Parquet file containing arXiv papers')
     parser.add_argument('--rows', default='5', help='Number of rows to evaluate (* for all rows)')
-    parser.add_argument('--output', help='Path to save the output CSV file')
-    
+    parser.add_argument('--output', help='Path to save the output Parquet file')
+
     args = parser.parse_args()
-    
-    # If no CSV path is provided, use the latest CSV in the results directory
-    if not args.csv:
-        csv_path = get_latest_csv()
-        if not csv_path:
-            logger.error("No CSV file specified and no CSV files found in results directory")
+
+    # If no input path is provided, use the latest Parquet file in the results directory
+    if not args.input:
+        input_path = get_latest_parquet()
+        if not input_path:
+            logger.error("No input file specified and no Parquet files found in results directory")
             return
     else:
-        csv_path = args.csv
-    
+        input_path = args.input
+
     # Evaluate the papers
-    evaluate_papers(csv_path, args.output, args.rows)
+    asyncio.run(evaluate_papers(input_path, args.output, args.rows))
 
 
 if __name__ == "__main__":